@@ -84,7 +84,9 @@ def get_rate_limiter(
 ) -> RateLimiter:
     # get or create
     key = f"{provider.name}\\{name}"
-    rate_limiters[key] = limiter = rate_limiters.get(key, RateLimiter(seconds=60))
+    limiter = rate_limiters.get(key)
+    if limiter is None:
+        rate_limiters[key] = limiter = RateLimiter(seconds=60)
     # always update
     limiter.limits["requests"] = requests or 0
     limiter.limits["input"] = input or 0
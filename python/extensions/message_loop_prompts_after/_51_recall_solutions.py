@@ -66,17 +66,21 @@ class RecallSolutions(Extension):
         # get solutions database
         db = await Memory.get(self.agent)
 
-        solutions = await db.search_similarity_threshold(
-            query=query,
-            limit=RecallSolutions.SOLUTIONS_COUNT,
-            threshold=RecallSolutions.THRESHOLD,
-            filter=f"area == '{Memory.Area.SOLUTIONS.value}'",
-        )
-        instruments = await db.search_similarity_threshold(
-            query=query,
-            limit=RecallSolutions.INSTRUMENTS_COUNT,
-            threshold=RecallSolutions.THRESHOLD,
-            filter=f"area == '{Memory.Area.INSTRUMENTS.value}'",
+        # embed the query once, then search both areas with the same vector concurrently
+        embedding = await db.embed_query(query)
+        solutions, instruments = await asyncio.gather(
+            db.search_similarity_threshold_by_vector(
+                embedding,
+                limit=RecallSolutions.SOLUTIONS_COUNT,
+                threshold=RecallSolutions.THRESHOLD,
+                filter=f"area == '{Memory.Area.SOLUTIONS.value}'",
+            ),
+            db.search_similarity_threshold_by_vector(
+                embedding,
+                limit=RecallSolutions.INSTRUMENTS_COUNT,
+                threshold=RecallSolutions.THRESHOLD,
+                filter=f"area == '{Memory.Area.INSTRUMENTS.value}'",
+            ),
         )
 
         log_item.update(
@@ -86,30 +86,27 @@ class MemorizeMemories(Extension):
         db = await Memory.get(self.agent)
 
         memories_txt = ""
-        rem = []
+        texts = []
         for memory in memories:
             # solution to plain text:
             txt = f"{memory}"
             memories_txt += "\n\n" + txt
             log_item.update(memories=memories_txt.strip())
+            texts.append(txt)
 
-            # remove previous fragments too similiar to this one
-            if self.REPLACE_THRESHOLD > 0:
-                rem += await db.delete_documents_by_query(
-                    query=txt,
-                    threshold=self.REPLACE_THRESHOLD,
-                    filter=f"area=='{Memory.Area.FRAGMENTS.value}'",
-                )
-                if rem:
-                    rem_txt = "\n\n".join(Memory.format_docs_plain(rem))
-                    log_item.update(replaced=rem_txt)
-
-            # insert new solution
-            await db.insert_text(text=txt, metadata={"area": Memory.Area.FRAGMENTS.value})
+        # insert new fragments, replacing previous ones too similiar to them
+        docs, rem = await db.insert_texts_replacing_similar(
+            texts,
+            area=Memory.Area.FRAGMENTS.value,
+            threshold=self.REPLACE_THRESHOLD,
+        )
+        if rem:
+            rem_txt = "\n\n".join(Memory.format_docs_plain(rem))
+            log_item.update(replaced=rem_txt)
 
         log_item.update(
-            result=f"{len(memories)} entries memorized.",
-            heading=f"{len(memories)} entries memorized.",
+            result=f"{len(docs)} entries memorized.",
+            heading=f"{len(docs)} entries memorized.",
         )
         if rem:
             log_item.stream(result=f"\nReplaced {len(rem)} previous memories.")
@@ -87,7 +87,7 @@ class MemorizeSolutions(Extension):
         db = await Memory.get(self.agent)
 
         solutions_txt = ""
-        rem = []
+        texts = []
         for solution in solutions:
             # solution to plain text:
             if isinstance(solution, dict):
@@ -98,26 +98,23 @@ class MemorizeSolutions(Extension):
                 # If solution is not a dict, convert it to string
                 txt = f"# Solution\n {str(solution)}"
             solutions_txt += txt + "\n\n"
+            texts.append(txt)
 
-            # remove previous solutions too similiar to this one
-            if self.REPLACE_THRESHOLD > 0:
-                rem += await db.delete_documents_by_query(
-                    query=txt,
-                    threshold=self.REPLACE_THRESHOLD,
-                    filter=f"area=='{Memory.Area.SOLUTIONS.value}'",
-                )
-                if rem:
-                    rem_txt = "\n\n".join(Memory.format_docs_plain(rem))
-                    log_item.update(replaced=rem_txt)
-
-            # insert new solution
-            await db.insert_text(text=txt, metadata={"area": Memory.Area.SOLUTIONS.value})
+        # insert new solutions, replacing previous ones too similiar to them
+        docs, rem = await db.insert_texts_replacing_similar(
+            texts,
+            area=Memory.Area.SOLUTIONS.value,
+            threshold=self.REPLACE_THRESHOLD,
+        )
+        if rem:
+            rem_txt = "\n\n".join(Memory.format_docs_plain(rem))
+            log_item.update(replaced=rem_txt)
 
         solutions_txt = solutions_txt.strip()
         log_item.update(solutions=solutions_txt)
         log_item.update(
-            result=f"{len(solutions)} solutions memorized.",
-            heading=f"{len(solutions)} solutions memorized.",
+            result=f"{len(docs)} solutions memorized.",
+            heading=f"{len(docs)} solutions memorized.",
         )
         if rem:
             log_item.stream(result=f"\nReplaced {len(rem)} previous solutions.")
@@ -1,43 +1,18 @@
 import os
-import base64
+import asyncio
 from pathlib import Path
-from mimetypes import guess_type
 import io
-import json
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Dict, Iterator, List, Optional, Tuple
 
-# Document processing imports
-try:
-    import PyPDF2
-    HAS_PDF = True
-except ImportError:
-    HAS_PDF = False
-
-try:
-    from PIL import Image
-    import pytesseract
-    HAS_OCR = True
-except ImportError:
-    HAS_OCR = False
-
-try:
-    import docx
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-
-try:
-    import openpyxl
-    import pandas as pd
-    HAS_EXCEL = True
-except ImportError:
-    HAS_EXCEL = False
-
-try:
-    from python.helpers import images
-    HAS_IMAGE_HELPER = True
-except ImportError:
-    HAS_IMAGE_HELPER = False
+# Document processing libraries are heavy to import and this module loads with the API,
+# only check they are installed here and import them when a matching file arrives
+HAS_PYMUPDF = find_spec("fitz") is not None
+HAS_PDF = find_spec("PyPDF2") is not None
+HAS_OCR = find_spec("PIL") is not None and find_spec("pytesseract") is not None
+HAS_DOCX = find_spec("docx") is not None
+HAS_EXCEL = find_spec("openpyxl") is not None and find_spec("pandas") is not None
 
 
 class DocumentProcessor:
@@ -123,7 +98,7 @@ class DocumentProcessor:
         # Process based on file type
         if result['type'] == 'text':
             result['text'] = await self._extract_text_file(file_path)
-        elif result['type'] == 'pdf' and HAS_PDF:
+        elif result['type'] == 'pdf' and (HAS_PYMUPDF or HAS_PDF):
             result['text'] = await self._extract_pdf_text(file_path)
         elif result['type'] == 'image':
             result['image_analysis'] = await self._analyze_image(file_path)
@@ -170,31 +145,106 @@ class DocumentProcessor:
     
     async def _extract_pdf_text(self, file_path: str) -> str:
         """Extract text from PDF files."""
-        if not HAS_PDF:
-            return "Error: PDF processing not available (PyPDF2 not installed)"
+        if not HAS_PYMUPDF and not HAS_PDF:
+            return "Error: PDF processing not available (PyMuPDF or PyPDF2 not installed)"
         
+        # parsing is CPU bound native code, keep it off the event loop
+        return await asyncio.to_thread(self._extract_pdf_text_sync, file_path)
+    
+    def _extract_pdf_text_sync(self, file_path: str) -> str:
+        """Extract text from PDF files in the calling thread."""
+        try:
+            stat = os.stat(file_path)
+        except Exception as e:
+            return f"Error extracting PDF: {str(e)}"
+        # mtime and size in the key make a re-uploaded file under the same name a cache miss
+        return DocumentProcessor._extract_pdf_text_cached(
+            os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, self.max_text_length
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _extract_pdf_text_cached(file_path: str, mtime_ns: int, size: int, max_text_length: int) -> str:
+        """Extract text from PDF files, memoized per file version."""
         try:
             text_content = []
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page_num, page in enumerate(pdf_reader.pages):
-                    if page_num >= 10:  # Limit to first 10 pages
-                        text_content.append("\n... (remaining pages truncated)")
-                        break
-                    try:
-                        text_content.append(f"\n--- Page {page_num + 1} ---\n")
-                        text_content.append(page.extract_text())
-                    except:
-                        text_content.append(f"\n--- Page {page_num + 1} (extraction failed) ---\n")
+            text_length = 0
+            more_pages = False
+            # pages are pulled one at a time, stop as soon as the output budget is used up
+            for page_num, text in DocumentProcessor._iter_pdf_pages(file_path):
+                if text_length > max_text_length:
+                    # the length cut below marks the truncation
+                    break
+                if page_num >= 10:  # Limit to first 10 pages
+                    more_pages = True
+                    break
+                if text is None:
+                    text_content.append(f"\n--- Page {page_num + 1} (extraction failed) ---\n")
+                    continue
+                text_content.append(f"\n--- Page {page_num + 1} ---\n")
+                text_content.append(text)
+                text_length += len(text)
             
             full_text = "\n".join(text_content)
-            if len(full_text) > self.max_text_length:
-                full_text = full_text[:self.max_text_length] + "\n... (truncated)"
+            if len(full_text) > max_text_length:
+                full_text = full_text[:max_text_length] + "\n... (truncated)"
+            elif more_pages:
+                full_text += "\n\n... (remaining pages truncated)"
             
             return full_text
         except Exception as e:
             return f"Error extracting PDF: {str(e)}"
     
+    @staticmethod
+    def _iter_pdf_pages(file_path: str) -> Iterator[Tuple[int, Optional[str]]]:
+        """Yield (page index, text) per page, PyMuPDF first with PyPDF2 as fallback."""
+        # read the file once, both parsers work on the same in-memory buffer
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        
+        if HAS_PYMUPDF:
+            import fitz  # PyMuPDF
+
+            try:
+                doc = fitz.open(stream=data, filetype="pdf")
+            except Exception:
+                # MuPDF could not open the file, try PyPDF2 if available
+                if not HAS_PDF:
+                    raise
+            else:
+                # no text can be read without the password, don't walk the pages
+                if doc.needs_pass:
+                    doc.close()
+                    raise ValueError("PDF is password protected")
+                return DocumentProcessor._iter_pdf_pages_pymupdf(doc)
+        return DocumentProcessor._iter_pdf_pages_pypdf2(data)
+    
+    @staticmethod
+    def _iter_pdf_pages_pymupdf(doc) -> Iterator[Tuple[int, Optional[str]]]:
+        """Yield page texts with PyMuPDF (native MuPDF parser)."""
+        with doc:
+            for page_num, page in enumerate(doc):
+                try:
+                    # pages without a content stream (blank) have nothing to extract
+                    text = page.get_text("text") if page.get_contents() else ""
+                except:
+                    text = None
+                yield page_num, text
+    
+    @staticmethod
+    def _iter_pdf_pages_pypdf2(data: bytes) -> Iterator[Tuple[int, Optional[str]]]:
+        """Yield page texts with PyPDF2 (pure Python fallback)."""
+        import PyPDF2
+
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        for page_num, page in enumerate(pdf_reader.pages):
+            try:
+                # pages without a content stream (blank) have nothing to extract
+                text = page.extract_text() if page.get("/Contents") is not None else ""
+            except:
+                text = None
+            yield page_num, text
+    
     async def _analyze_image(self, file_path: str) -> Dict[str, any]:
         """Analyze image files and extract text if possible."""
         analysis = {
@@ -205,6 +255,8 @@ class DocumentProcessor:
         }
         
         try:
+            from PIL import Image
+            
             # Get basic image properties
             with Image.open(file_path) as img:
                 analysis['properties'] = {
@@ -217,6 +269,7 @@ class DocumentProcessor:
                 # Try OCR if available
                 if HAS_OCR:
                     try:
+                        import pytesseract
                         extracted_text = pytesseract.image_to_string(img)
                         if extracted_text.strip():
                             analysis['has_text'] = True
@@ -242,6 +295,8 @@ class DocumentProcessor:
             return "Error: DOCX processing not available (python-docx not installed)"
         
         try:
+            import docx
+            
             doc = docx.Document(file_path)
             paragraphs = []
             
@@ -263,6 +318,8 @@ class DocumentProcessor:
             return {"error": "Excel processing not available (openpyxl/pandas not installed)"}
         
         try:
+            import pandas as pd
+            
             # Read with pandas for better structure
             xl_file = pd.ExcelFile(file_path)
             sheets_data = {}
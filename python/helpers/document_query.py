@@ -14,7 +14,6 @@ from typing import Callable, Sequence, List, Optional, Tuple
 from datetime import datetime
 
 from langchain_community.document_loaders import AsyncHtmlLoader
-from langchain_community.document_loaders.text import TextLoader
 from langchain_community.document_loaders.pdf import PyMuPDFLoader
 from langchain_community.document_transformers import MarkdownifyTransformer
 from langchain_community.document_loaders.parsers.images import TesseractBlobParser
@@ -22,16 +21,6 @@ from langchain_community.document_loaders.parsers.images import TesseractBlobPar
 from langchain_core.documents import Document
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema import SystemMessage, HumanMessage
-from langchain.storage import LocalFileStore, InMemoryStore
-from langchain.embeddings import CacheBackedEmbeddings
-
-from langchain_community.vectorstores import FAISS
-import faiss
-from langchain_community.docstore.in_memory import InMemoryDocstore
-from langchain_community.vectorstores.utils import (
-    DistanceStrategy,
-)
-from langchain_core.embeddings import Embeddings
 
 from python.helpers.print_style import PrintStyle
 from python.helpers import files
@@ -449,9 +438,10 @@ class DocumentQueryHelper:
                 response: aiohttp.ClientResponse | None = None
                 retries = 0
                 last_error = ""
-                while not response and retries < 3:
-                    try:
-                        async with aiohttp.ClientSession() as session:
+                # one session for all retries so the connection can be reused
+                async with aiohttp.ClientSession() as session:
+                    while not response and retries < 3:
+                        try:
                             response = await session.head(
                                 document_uri,
                                 timeout=aiohttp.ClientTimeout(total=2.0),
@@ -460,10 +450,10 @@ class DocumentQueryHelper:
                             if response.status > 399:
                                 raise Exception(response.status)
                             break
-                    except Exception as e:
-                        await asyncio.sleep(1)
-                        last_error = str(e)
-                    retries += 1
+                        except Exception as e:
+                            await asyncio.sleep(1)
+                            last_error = str(e)
+                        retries += 1
 
                 if not response:
                     raise ValueError(
@@ -636,8 +626,9 @@ class DocumentQueryHelper:
 
                 # Convert PDF to images
                 pages = pdf2image.convert_from_path(temp_file_path)  # type: ignore
-                for page in pages:
-                    contents += pytesseract.image_to_string(page) + "\n\n"
+                contents = "".join(
+                    pytesseract.image_to_string(page) + "\n\n" for page in pages
+                )
 
             return contents
         finally:
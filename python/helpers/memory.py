@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, List, Sequence
 from langchain.storage import InMemoryByteStore, LocalFileStore
 from langchain.embeddings import CacheBackedEmbeddings
@@ -54,6 +55,7 @@ class Memory:
         INSTRUMENTS = "instruments"
 
     index: dict[str, "MyFaiss"] = {}
+    embeddings_models: dict[str, Embeddings] = {}
 
     @staticmethod
     async def get(agent: Agent):
@@ -88,6 +90,10 @@ class Memory:
         memory_subdir = agent.config.memory_subdir or "default"
         if Memory.index.get(memory_subdir):
             del Memory.index[memory_subdir]
+        # rebuild the model too, it holds the API key read when it was created
+        Memory.embeddings_models.pop(
+            Memory._get_embeddings_model_key(agent.config.embeddings_model), None
+        )
         return await Memory.get(agent)
 
     @staticmethod
@@ -117,12 +123,7 @@ class Memory:
             os.makedirs(em_dir, exist_ok=True)
             store = LocalFileStore(em_dir)
 
-        embeddings_model = models.get_model(
-            models.ModelType.EMBEDDING,
-            model_config.provider,
-            model_config.name,
-            **model_config.kwargs,
-        )
+        embeddings_model = Memory._get_embeddings_model(model_config)
         embeddings_model_id = files.safe_file_name(
             model_config.provider.name + "_" + model_config.name
         )
@@ -205,6 +206,27 @@ class Memory:
 
         return db, created
 
+    @staticmethod
+    def _get_embeddings_model_key(model_config: ModelConfig) -> str:
+        return json.dumps(
+            [model_config.provider.name, model_config.name, model_config.kwargs],
+            sort_keys=True,
+            default=str,
+        )
+
+    @staticmethod
+    def _get_embeddings_model(model_config: ModelConfig) -> Embeddings:
+        # local models (sentence-transformers) are expensive to load, keep one instance per config
+        key = Memory._get_embeddings_model_key(model_config)
+        if key not in Memory.embeddings_models:
+            Memory.embeddings_models[key] = models.get_model(
+                models.ModelType.EMBEDDING,
+                model_config.provider,
+                model_config.name,
+                **model_config.kwargs,
+            )
+        return Memory.embeddings_models[key]
+
     def __init__(
         self,
         agent: Agent,
@@ -293,23 +315,43 @@ class Memory:
     async def search_similarity_threshold(
         self, query: str, limit: int, threshold: float, filter: str = ""
     ):
-        comparator = Memory._get_comparator(filter) if filter else None
+        embedding = await self.embed_query(query)
+        return await self.search_similarity_threshold_by_vector(
+            embedding, limit=limit, threshold=threshold, filter=filter
+        )
 
+    async def embed_query(self, query: str) -> list[float]:
         # rate limiter
         await self.agent.rate_limiter(
             model_config=self.agent.config.embeddings_model, input=query
         )
 
-        return await self.db.asearch(
-            query,
-            search_type="similarity_score_threshold",
-            k=limit,
-            score_threshold=threshold,
-            filter=comparator,
+        return await self.db.embedding_function.aembed_query(query)  # type: ignore
+
+    async def search_similarity_threshold_by_vector(
+        self, embedding: list[float], limit: int, threshold: float, filter: str = ""
+    ):
+        comparator = Memory._get_comparator(filter) if filter else None
+
+        docs_and_scores = await self.db.asimilarity_search_with_score_by_vector(
+            embedding, k=limit, filter=comparator
         )
+        # relevance score is the normalized inner product, keep docs at or over the threshold
+        return [
+            doc
+            for doc, score in docs_and_scores
+            if Memory._cosine_normalizer(score) >= threshold
+        ]
 
     async def delete_documents_by_query(
         self, query: str, threshold: float, filter: str = ""
+    ):
+        # embed once, every pass of the delete loop searches with the same vector
+        embedding = await self.embed_query(query)
+        return await self.delete_documents_by_vector(embedding, threshold, filter)
+
+    async def delete_documents_by_vector(
+        self, embedding: list[float], threshold: float, filter: str = ""
     ):
         k = 100
         tot = 0
@@ -317,8 +359,8 @@ class Memory:
 
         while True:
             # Perform similarity search with score
-            docs = await self.search_similarity_threshold(
-                query, limit=k, threshold=threshold, filter=filter
+            docs = await self.search_similarity_threshold_by_vector(
+                embedding, limit=k, threshold=threshold, filter=filter
             )
             removed += docs
 
@@ -353,6 +395,37 @@ class Memory:
             self._save_db()  # persist
         return rem_docs
 
+    async def insert_texts_replacing_similar(
+        self, texts: list[str], area: str, threshold: float
+    ) -> tuple[list[Document], list[Document]]:
+        # returns the inserted documents and the stored documents they replaced
+        docs: list[Document] = []
+        embeddings: list[list[float]] = []
+        replaced: dict[str, Document] = {}
+
+        for text in texts:
+            if threshold > 0:
+                embedding = await self.embed_query(text)
+                # stored entries are only deleted once their replacements are saved
+                for doc in await self.search_similarity_threshold_by_vector(
+                    embedding, limit=100, threshold=threshold, filter=f"area=='{area}'"
+                ):
+                    replaced[doc.metadata["id"]] = doc
+                # entries of this batch are not stored yet, a later one replaces an earlier one
+                for i in reversed(Memory._find_similar(embedding, embeddings, threshold)):
+                    docs.pop(i)
+                    embeddings.pop(i)
+                embeddings.append(embedding)
+            docs.append(Document(text, metadata={"area": area}))
+
+        # insert first, a failure above or here leaves the previous entries in place
+        if docs:
+            await self.insert_documents(docs)
+        if replaced:
+            await self.delete_documents_by_ids(list(replaced.keys()))
+
+        return docs, list(replaced.values())
+
     async def insert_text(self, text, metadata: dict = {}):
         doc = Document(text, metadata=metadata)
         ids = await self.insert_documents([doc])
@@ -387,17 +460,45 @@ class Memory:
         abs_dir = Memory._abs_db_dir(memory_subdir)
         db.save_local(folder_path=abs_dir)
 
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile_condition(condition: str):
+        # filters repeat across searches (recall and memorize extensions use fixed ones)
+        return compile(condition, "<filter>", "eval")
+
     @staticmethod
     def _get_comparator(condition: str):
+        # compile once, the comparator is evaluated for every document in the index
+        try:
+            code = Memory._compile_condition(condition)
+        except Exception:
+            return lambda data: False
+
         def comparator(data: dict[str, Any]):
             try:
-                return eval(condition, {}, data)
+                return eval(code, {}, data)
             except Exception as e:
                 # PrintStyle.error(f"Error evaluating condition: {e}")
                 return False
 
         return comparator
 
+    @staticmethod
+    def _find_similar(
+        embedding: list[float], embeddings: list[list[float]], threshold: float
+    ) -> list[int]:
+        # indices of embeddings scoring over the threshold, raw inner product like the IndexFlatIP searches
+        if not embeddings:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        others = np.asarray(embeddings, dtype=np.float32)
+        scores = others @ query
+        return [
+            i
+            for i, score in enumerate(scores)
+            if Memory._cosine_normalizer(float(score)) >= threshold
+        ]
+
     @staticmethod
     def _score_normalizer(val: float) -> float:
         res = 1 - 1 / (1 + np.exp(val))
@@ -445,3 +546,8 @@ def get_custom_knowledge_subdir_abs(agent: Agent) -> str:
 def reload():
     # clear the memory index, this will force all DBs to reload
     Memory.index = {}
+    # models hold the api keys and urls read when they were created, rebuild them too
+    Memory.embeddings_models = {}
+    from python.helpers.vector_db import VectorDB
+
+    VectorDB._cached_embeddings = {}
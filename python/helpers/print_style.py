@@ -1,11 +1,16 @@
 import os, webcolors, html
 import sys
+import threading
 from datetime import datetime
+from functools import lru_cache
 from . import files
 
 class PrintStyle:
     last_endline = True
     log_file_path = None
+    log_file = None
+    # printing happens from agent loop threads and API request threads, writes to the shared log are serialized
+    log_lock = threading.Lock()
 
     def __init__(self, bold=False, italic=False, underline=False, font_color="default", background_color="default", padding=False, log_only=False):
         self.bold = bold
@@ -18,14 +23,21 @@ class PrintStyle:
         self.log_only = log_only
 
         if PrintStyle.log_file_path is None:
-            logs_dir = files.get_abs_path("logs")
-            os.makedirs(logs_dir, exist_ok=True)
-            log_filename = datetime.now().strftime("log_%Y%m%d_%H%M%S.html")
-            PrintStyle.log_file_path = os.path.join(logs_dir, log_filename)
-            with open(PrintStyle.log_file_path, "w") as f:
-                f.write("<html><body style='background-color:black;font-family: Arial, Helvetica, sans-serif;'><pre>\n")
-
-    def _get_rgb_color_code(self, color, is_background=False):
+            with PrintStyle.log_lock:
+                if PrintStyle.log_file_path is None:
+                    logs_dir = files.get_abs_path("logs")
+                    os.makedirs(logs_dir, exist_ok=True)
+                    log_filename = datetime.now().strftime("log_%Y%m%d_%H%M%S.html")
+                    # keep the log open for the whole process instead of reopening it per write
+                    log_file_path = os.path.join(logs_dir, log_filename)
+                    PrintStyle.log_file = open(log_file_path, "w", encoding="utf-8")
+                    PrintStyle.log_file.write("<html><body style='background-color:black;font-family: Arial, Helvetica, sans-serif;'><pre>\n")
+                    PrintStyle.log_file_path = log_file_path
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _get_rgb_color_code(color, is_background=False):
+        # styles use a small fixed set of colors, resolve each one only once
         try:
             if color.startswith("#") and len(color) == 7:
                 r = int(color[1:3], 16)
@@ -80,15 +92,19 @@ class PrintStyle:
             self._log_html("<br>")
             self.padding_added = True
 
-    def _log_html(self, html):
-        with open(PrintStyle.log_file_path, "a", encoding='utf-8') as f: # type: ignore # add encoding='utf-8'
-            f.write(html)
+    def _log_html(self, html, flush=False):
+        with PrintStyle.log_lock:
+            if PrintStyle.log_file and not PrintStyle.log_file.closed:
+                PrintStyle.log_file.write(html)
+                if flush:
+                    PrintStyle.log_file.flush()
 
     @staticmethod
     def _close_html_log():
-        if PrintStyle.log_file_path:
-            with open(PrintStyle.log_file_path, "a") as f:
-                f.write("</pre></body></html>")
+        with PrintStyle.log_lock:
+            if PrintStyle.log_file and not PrintStyle.log_file.closed:
+                PrintStyle.log_file.write("</pre></body></html>")
+                PrintStyle.log_file.close()
 
     def get(self, *args, sep=' ', **kwargs):
         text = sep.join(map(str, args))
@@ -102,7 +118,7 @@ class PrintStyle:
         plain_text, styled_text, html_text = self.get(*args, sep=sep, **kwargs)
         if not self.log_only:
             print(styled_text, end='\n', flush=True)
-        self._log_html(html_text+"<br>\n")
+        self._log_html(html_text+"<br>\n", flush=True)
         PrintStyle.last_endline = True
 
     def stream(self, *args, sep=' ', **kwargs):
@@ -110,7 +126,8 @@ class PrintStyle:
         plain_text, styled_text, html_text = self.get(*args, sep=sep, **kwargs)
         if not self.log_only:
             print(styled_text, end='', flush=True)
-        self._log_html(html_text)
+        # flushed per fragment like the console, a long streamed response must not sit in the buffer
+        self._log_html(html_text, flush=True)
         PrintStyle.last_endline = False
 
     def is_last_line_empty(self):
@@ -11,7 +11,7 @@ class RateLimiter:
         self._lock = asyncio.Lock()
 
     def add(self, **kwargs: int):
-        now = time.time()
+        now = time.monotonic()
         for key, value in kwargs.items():
             if not key in self.values:
                 self.values[key] = []
@@ -19,7 +19,7 @@ class RateLimiter:
 
     async def cleanup(self):
         async with self._lock:
-            now = time.time()
+            now = time.monotonic()
             cutoff = now - self.timeframe
             for key in self.values:
                 self.values[key] = [(t, v) for t, v in self.values[key] if t > cutoff]
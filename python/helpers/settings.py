@@ -865,10 +865,15 @@ def get_settings() -> Settings:
 def set_settings(settings: Settings, apply: bool = True):
     global _settings
     previous = _settings
+    # api keys are moved to .env on write, compare them before that
+    api_keys_changed = any(
+        (dotenv.get_dotenv_value(key.upper()) or "") != (val or "")
+        for key, val in settings.get("api_keys", {}).items()
+    )
     _settings = normalize_settings(settings)
     _write_settings_file(_settings)
     if apply:
-        _apply_settings(previous)
+        _apply_settings(previous, api_keys_changed)
 
 
 def set_settings_delta(delta: dict, apply: bool = True):
@@ -1011,7 +1016,7 @@ def get_default_settings() -> Settings:
     )
 
 
-def _apply_settings(previous: Settings | None):
+def _apply_settings(previous: Settings | None, api_keys_changed: bool = False):
     global _settings
     if _settings:
         from agent import AgentContext
@@ -1032,8 +1037,8 @@ def _apply_settings(previous: Settings | None):
                 whisper.preload, _settings["stt_model_size"]
             )  # TODO overkill, replace with background task
 
-        # force memory reload on embedding model change
-        if not previous or (
+        # force memory reload on embedding model or api key change
+        if not previous or api_keys_changed or (
             _settings["embed_model_name"] != previous["embed_model_name"]
             or _settings["embed_model_provider"] != previous["embed_model_provider"]
             or _settings["embed_model_kwargs"] != previous["embed_model_kwargs"]
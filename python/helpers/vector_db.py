@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Any, List, Sequence
 import uuid
 from langchain_community.vectorstores import FAISS
@@ -16,6 +17,7 @@ from langchain_community.vectorstores.utils import (
 from langchain.embeddings import CacheBackedEmbeddings
 
 from agent import Agent
+from python.helpers.memory import Memory
 
 
 class MyFaiss(FAISS):
@@ -37,22 +39,20 @@ class VectorDB:
 
     @staticmethod
     def _get_embeddings(agent: Agent):
-        model = agent.get_embedding_model()
-        namespace = getattr(
-            model,
-            "model",
-            getattr(model, "model_name", "default"),
-        )
-        if namespace not in VectorDB._cached_embeddings:
+        # same model instance and cache key as the memory index, local models are loaded only once
+        model_config = agent.config.embeddings_model
+        key = Memory._get_embeddings_model_key(model_config)
+        if key not in VectorDB._cached_embeddings:
+            model = Memory._get_embeddings_model(model_config)
             store = InMemoryByteStore()
-            VectorDB._cached_embeddings[namespace] = (
+            VectorDB._cached_embeddings[key] = (
                 CacheBackedEmbeddings.from_bytes_store(
                     model,
                     store,
-                    namespace=namespace,
+                    namespace=f"{model_config.provider.name}_{model_config.name}",
                 )
             )
-        return VectorDB._cached_embeddings[namespace]
+        return VectorDB._cached_embeddings[key]
 
     def __init__(self, agent: Agent):
         self.agent = agent
@@ -145,10 +145,21 @@ def cosine_normalizer(val: float) -> float:
     return res
 
 
+@lru_cache(maxsize=256)
+def compile_condition(condition: str):
+    # filters repeat across searches (same document_uri for get/exists/delete)
+    return compile(condition, "<filter>", "eval")
+
+
 def get_comparator(condition: str):
+    try:
+        code = compile_condition(condition)
+    except Exception:
+        return lambda data: False
+
     def comparator(data: dict[str, Any]):
         try:
-            result = eval(condition, {}, data)
+            result = eval(code, {}, data)
             return result
         except Exception as e:
             # PrintStyle.error(f"Error evaluating condition: {e}")
@@ -98,8 +98,10 @@ class DirectCodeExecution(Tool):
                         exec(code, self.agent._code_namespace)
                         
                 except Exception as e:
-                    # Print the exception to stderr
-                    traceback.print_exc()
+                    # Format the traceback once, starting at the executed code's frame
+                    error_buffer.write("".join(
+                        traceback.format_exception(type(e), e, e.__traceback__.tb_next)
+                    ))
 
             # Get output and errors
             stdout = output_buffer.getvalue()